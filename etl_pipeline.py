@@ -3,77 +3,555 @@ Financial Data ETL Pipeline
 Author: Gabriel Demetrios Lafis
 """
 
-import pandas as pd
+from __future__ import annotations
+
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import copy
+import functools
+import hashlib
+import importlib
+import importlib.util
 import json
 import logging
+import os
+
+
+class _LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def _optional_module(name: str) -> Optional[_LazyModule]:
+    """Lazy proxy for an optional dependency, or None when it is not installed"""
+    if importlib.util.find_spec(name.split('.')[0]) is None:
+        return None
+    return _LazyModule(name)
+
+
+# Heavy imports are deferred so ingestion-only runs (e.g. extract_json_raw)
+# do not pay for pandas/pyarrow start-up
+pd = _LazyModule('pandas')
+
+# pyarrow is optional; fall back to the pandas readers/writers
+pa = _optional_module('pyarrow')
+pacsv = _optional_module('pyarrow.csv')
+ds = _optional_module('pyarrow.dataset')
+pq = _optional_module('pyarrow.parquet')
+
+
+def _jit(func: Callable) -> Callable:
+    """Compile func with numba on first call; plain Python when numba is missing"""
+    compiled = None
+    
+    @functools.wraps(func)
+    def wrapper(*args):
+        nonlocal compiled
+        if compiled is None:
+            try:
+                from numba import njit
+                # error_model='numpy' gives inf/nan on division by zero instead of raising,
+                # matching the plain-Python fallback and pandas
+                compiled = njit(cache=True, error_model='numpy')(func)
+            except ImportError:
+                compiled = func
+        return compiled(*args)
+    
+    return wrapper
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; fall back to hashlib
+    xxhash = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SOURCE_TYPES = ('csv', 'json', 'api', 'parquet', 'csv_dataset')
+INDICATOR_COLUMNS = ('sma_20', 'sma_50', 'returns', 'log_returns', 'volatility_20', 'rsi')
+
+
+# Closes kept between streaming updates: 50 for sma_50 plus one more so the
+# return leaving the 20-bar volatility window can be recomputed
+_TAIL_LENGTH = 51
+
+# Layout of the running-state vector shared by the batch and streaming paths
+(_SUM20, _CNT20, _SUM50, _CNT50, _RET_MEAN20, _RET_M2_20, _RET_CNT20,
+ _AVG_GAIN, _AVG_LOSS, _RSI_CNT) = range(10)
+_STATE_SIZE = 10
+
+
+@_jit
+def _advance_indicators(close: np.ndarray, start: int, state: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Single pass over close[start:] computing sma_20, sma_50, returns,
+    log_returns, volatility_20 and RSI(14) with running window sums.
+    close[:start] is history already folded into `state`, which is updated
+    in place. NaN inputs are excluded from the sums and invalidate their windows.
+    """
+    n = close.shape[0]
+    m = n - start
+    sma_20 = np.full(m, np.nan)
+    sma_50 = np.full(m, np.nan)
+    returns = np.full(m, np.nan)
+    log_returns = np.full(m, np.nan)
+    volatility_20 = np.full(m, np.nan)
+    rsi = np.full(m, np.nan)
+
+    sum20 = state[_SUM20]
+    cnt20 = int(state[_CNT20])
+    sum50 = state[_SUM50]
+    cnt50 = int(state[_CNT50])
+    ret_mean20 = state[_RET_MEAN20]
+    ret_m2_20 = state[_RET_M2_20]
+    ret_cnt20 = int(state[_RET_CNT20])
+    avg_gain = state[_AVG_GAIN]
+    avg_loss = state[_AVG_LOSS]
+    rsi_cnt = int(state[_RSI_CNT])
+    annualize = np.sqrt(252.0)
+
+    for i in range(start, n):
+        k = i - start
+        c = close[i]
+        if not np.isnan(c):
+            sum20 += c
+            cnt20 += 1
+            sum50 += c
+            cnt50 += 1
+        if i >= 20 and not np.isnan(close[i - 20]):
+            sum20 -= close[i - 20]
+            cnt20 -= 1
+        if i >= 50 and not np.isnan(close[i - 50]):
+            sum50 -= close[i - 50]
+            cnt50 -= 1
+        if cnt20 == 20:
+            sma_20[k] = sum20 / 20.0
+        if cnt50 == 50:
+            sma_50[k] = sum50 / 50.0
+
+        if i == 0:
+            continue
+
+        prev = close[i - 1]
+        r = c / prev - 1.0
+        returns[k] = r
+        # log(c / prev) == log1p(r): reuses the return instead of dividing again
+        log_returns[k] = np.log1p(r)
+
+        # Volatility over the trailing 20 returns (windowed Welford update,
+        # avoids the cancellation of sum-of-squares minus squared-sum)
+        if not np.isnan(r):
+            ret_cnt20 += 1
+            d = r - ret_mean20
+            ret_mean20 += d / ret_cnt20
+            ret_m2_20 += d * (r - ret_mean20)
+        if i >= 21:
+            old = close[i - 20] / close[i - 21] - 1.0
+            if not np.isnan(old):
+                ret_cnt20 -= 1
+                if ret_cnt20 == 0:
+                    ret_mean20 = 0.0
+                    ret_m2_20 = 0.0
+                else:
+                    d = old - ret_mean20
+                    ret_mean20 -= d / ret_cnt20
+                    ret_m2_20 -= d * (old - ret_mean20)
+        if ret_cnt20 == 20:
+            volatility_20[k] = np.sqrt(max(ret_m2_20 / 19.0, 0.0)) * annualize
+
+        # RSI with Wilder smoothing, seeded by the first price change
+        delta = c - prev
+        if not np.isnan(delta):
+            gain = max(delta, 0.0)
+            loss = max(-delta, 0.0)
+            if rsi_cnt == 0:
+                avg_gain = gain
+                avg_loss = loss
+            else:
+                avg_gain = (avg_gain * 13.0 + gain) / 14.0
+                avg_loss = (avg_loss * 13.0 + loss) / 14.0
+            rsi_cnt += 1
+        if rsi_cnt >= 14:
+            if avg_loss == 0.0:
+                rsi[k] = 100.0  # RSI=100 when loss=0
+            else:
+                rsi[k] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    state[_SUM20] = sum20
+    state[_CNT20] = cnt20
+    state[_SUM50] = sum50
+    state[_CNT50] = cnt50
+    state[_RET_MEAN20] = ret_mean20
+    state[_RET_M2_20] = ret_m2_20
+    state[_RET_CNT20] = ret_cnt20
+    state[_AVG_GAIN] = avg_gain
+    state[_AVG_LOSS] = avg_loss
+    state[_RSI_CNT] = rsi_cnt
+
+    return sma_20, sma_50, returns, log_returns, volatility_20, rsi
+
+
+def _assign_indicators(df: pd.DataFrame, indicators: Tuple[np.ndarray, ...]) -> pd.DataFrame:
+    """
+    Attach the kernel outputs with a single assign (one block insertion instead
+    of one per column), at the precision of the close column.
+    """
+    close_dtype = df['close'].dtype
+    dtype = close_dtype if close_dtype in (np.float32, np.float64) else np.float64
+    return df.assign(**{
+        name: values.astype(dtype, copy=False)
+        for name, values in zip(INDICATOR_COLUMNS, indicators)
+    })
+
+
+def _csv_format(timestamp_type: Any) -> Any:
+    """pyarrow dataset CSV format reading the timestamp column as timestamp_type"""
+    return ds.CsvFileFormat(
+        convert_options=pacsv.ConvertOptions(
+            column_types={'timestamp': timestamp_type},
+            strings_can_be_null=True,
+        )
+    )
+
+
+def _array_digest(arr: np.ndarray) -> int:
+    """Fast content hash of a contiguous array's bytes"""
+    if xxhash is not None:
+        return xxhash.xxh64(arr).intdigest()
+    return int.from_bytes(hashlib.blake2b(arr, digest_size=8).digest(), 'little')
+
+
+def _read_json(filepath: str) -> Any:
+    """Parse a JSON file, with orjson when it is installed"""
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN/Infinity tokens the stdlib writes by default
+            return json.loads(raw)
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+def _write_json(data: Any, filepath: str):
+    """Serialize to a JSON file, with orjson when it is installed"""
+    if orjson is not None:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data))
+    else:
+        with open(filepath, 'w') as f:
+            json.dump(data, f)
+
+
+def _records_to_columns(data):
+    """
+    Turn records-oriented JSON into a dict of columns so pandas builds each
+    column from one list. Anything else (or ragged records) is returned as-is.
+    """
+    if not isinstance(data, list) or not data or not isinstance(data[0], dict):
+        return data
+    keys = list(data[0])
+    if not all(isinstance(r, dict) and len(r) == len(keys) for r in data):
+        return data
+    try:
+        return {k: [r[k] for r in data] for k in keys}
+    except KeyError:
+        return data
+
+
+class QualityReport:
+    """
+    Columnar data-quality log backed by a NumPy structured array.
+    Rows are appended in amortized O(1) (capacity doubles when full).
+    """
+    
+    dtype = np.dtype([
+        ('timestamp', 'datetime64[us]'),
+        ('initial_rows', np.int64),
+        ('final_rows', np.int64),
+        ('removed_rows', np.int64),
+        ('issues', object),
+    ])
+    
+    def __init__(self, capacity: int = 16):
+        self._data = np.empty(capacity, dtype=self.dtype)
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, entry: Dict):
+        """Append one validation entry (keys match the dtype fields)"""
+        if self._size == len(self._data):
+            grown = np.empty(max(2 * len(self._data), 1), dtype=self.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = (
+            np.datetime64(entry['timestamp'], 'us'),
+            entry['initial_rows'],
+            entry['final_rows'],
+            entry['removed_rows'],
+            list(entry['issues']),
+        )
+        self._size += 1
+    
+    def extend(self, entries):
+        """Append several validation entries"""
+        for entry in entries:
+            self.append(entry)
+    
+    def clear(self):
+        """Drop all rows, keeping the allocated capacity"""
+        self._data['issues'][:self._size] = None  # release the issue lists
+        self._size = 0
+    
+    def to_records(self) -> np.ndarray:
+        """Structured array view of the filled rows"""
+        return self._data[:self._size]
+    
+    def to_dicts(self) -> List[Dict]:
+        """Rows as dicts, in the shape of the original list-based report"""
+        return [
+            {
+                'timestamp': row['timestamp'].item(),
+                'initial_rows': int(row['initial_rows']),
+                'final_rows': int(row['final_rows']),
+                'removed_rows': int(row['removed_rows']),
+                'issues': row['issues'],
+            }
+            for row in self.to_records()
+        ]
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Rows as a DataFrame"""
+        return pd.DataFrame(self.to_records())
+
+
+@dataclass
+class IndicatorState:
+    """
+    Running indicator state carried between streaming updates.
+    Holds the last closes plus the running sums/averages of each window.
+    """
+    close_tail: np.ndarray = field(default_factory=lambda: np.empty(0))
+    sum20: float = 0.0
+    cnt20: int = 0
+    sum50: float = 0.0
+    cnt50: int = 0
+    ret_mean20: float = 0.0
+    ret_m2_20: float = 0.0
+    ret_cnt20: int = 0
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+    rsi_cnt: int = 0
+
+    def to_array(self) -> np.ndarray:
+        """Pack the running values into the kernel's state vector"""
+        return np.array([
+            self.sum20, self.cnt20, self.sum50, self.cnt50,
+            self.ret_mean20, self.ret_m2_20, self.ret_cnt20,
+            self.avg_gain, self.avg_loss, self.rsi_cnt,
+        ], dtype=np.float64)
+
+    @classmethod
+    def from_array(cls, close_tail: np.ndarray, state: np.ndarray) -> 'IndicatorState':
+        """Unpack a kernel state vector"""
+        return cls(
+            close_tail=close_tail,
+            sum20=float(state[_SUM20]), cnt20=int(state[_CNT20]),
+            sum50=float(state[_SUM50]), cnt50=int(state[_CNT50]),
+            ret_mean20=float(state[_RET_MEAN20]), ret_m2_20=float(state[_RET_M2_20]),
+            ret_cnt20=int(state[_RET_CNT20]),
+            avg_gain=float(state[_AVG_GAIN]), avg_loss=float(state[_AVG_LOSS]),
+            rsi_cnt=int(state[_RSI_CNT]),
+        )
+
+
 class FinancialDataETL:
     """
     ETL Pipeline for financial market data.
     Extract from multiple sources, Transform with validation, Load to database.
     """
     
-    def __init__(self, output_format: str = 'csv'):
+    def __init__(self,
+                 output_format: str = 'csv',
+                 compression: Optional[str] = 'snappy',
+                 row_group_size: int = 128_000,
+                 dtype: Optional[str] = 'float32',
+                 seed: Optional[int] = None,
+                 lightweight: bool = False,
+                 indicator_cache_size: int = 32):
         self.output_format = output_format
-        self.data_quality_report = []
+        self.lightweight = lightweight
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.dtype = dtype
+        self._rng = np.random.default_rng(seed)
+        self.data_quality_report = QualityReport()
+        self._indicator_state: Optional[IndicatorState] = None
+        # LRU of indicator results keyed by (length, hash of the close prices)
+        self.indicator_cache_size = indicator_cache_size
+        self._indicator_cache: OrderedDict = OrderedDict()
         
     def extract_csv(self, filepath: str) -> pd.DataFrame:
         """Extract data from CSV file"""
         logger.info(f"Extracting data from {filepath}")
         try:
-            df = pd.read_csv(filepath, parse_dates=['timestamp'])
+            df = None
+            if pacsv is not None:
+                # Multi-threaded Arrow parser, converted straight to pandas
+                try:
+                    table = pacsv.read_csv(
+                        filepath,
+                        read_options=pacsv.ReadOptions(use_threads=True),
+                        convert_options=pacsv.ConvertOptions(
+                            column_types={'timestamp': pa.timestamp('ns')},
+                            strings_can_be_null=True,  # empty cells are missing, as in pd.read_csv
+                        ),
+                    )
+                    df = table.to_pandas(self_destruct=True)
+                except pa.ArrowInvalid as e:
+                    # e.g. tz-aware or non-ISO timestamps, which pandas still parses
+                    logger.warning(f"Arrow CSV parser rejected {filepath} ({e}); retrying with pandas")
+            if df is None:
+                df = pd.read_csv(filepath, parse_dates=['timestamp'])
             logger.info(f"Extracted {len(df)} rows")
             return df
         except Exception as e:
             logger.error(f"Error extracting CSV: {e}")
             return pd.DataFrame()
     
-    def extract_json(self, filepath: str) -> pd.DataFrame:
-        """Extract data from JSON file"""
+    def extract_json(self, filepath: str) -> Union[pd.DataFrame, List[Dict]]:
+        """Extract data from JSON file (parsed records in lightweight mode)"""
+        if self.lightweight:
+            return self.extract_json_raw(filepath)
+        return self._extract_json_frame(filepath)
+    
+    def extract_json_raw(self, filepath: str) -> List[Dict]:
+        """Extract JSON records without importing pandas or building a DataFrame"""
+        logger.info(f"Extracting data from {filepath}")
+        try:
+            data = _read_json(filepath)
+            logger.info(f"Extracted {len(data)} rows")
+            return data
+        except Exception as e:
+            logger.error(f"Error extracting JSON: {e}")
+            return []
+    
+    def _extract_json_frame(self, filepath: str) -> pd.DataFrame:
+        """Extract data from JSON file into a DataFrame"""
         logger.info(f"Extracting data from {filepath}")
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            df = pd.DataFrame(data)
+            df = pd.DataFrame(_records_to_columns(_read_json(filepath)))
             logger.info(f"Extracted {len(df)} rows")
             return df
         except Exception as e:
             logger.error(f"Error extracting JSON: {e}")
             return pd.DataFrame()
     
+    def extract_dataset(self,
+                        path_or_paths: Union[str, List[str]],
+                        format: str = 'csv',
+                        columns: Optional[List[str]] = None,
+                        filter: Optional[Any] = None) -> pd.DataFrame:
+        """
+        Extract data from one or many files through the PyArrow dataset API.
+        
+        Args:
+            path_or_paths: File, directory or list of files (e.g. one CSV per day)
+            format: 'csv' or 'parquet'
+            columns: Columns to read; Parquet skips the others entirely
+            filter: Optional pyarrow.dataset expression pushed down to the scan,
+                e.g. ds.field('close') > 0
+        """
+        logger.info(f"Extracting {format} dataset from {path_or_paths}")
+        if ds is None:
+            logger.error("Error extracting dataset: pyarrow is not installed")
+            return pd.DataFrame()
+        try:
+            if format == 'csv':
+                try:
+                    df = self._scan_dataset(path_or_paths, _csv_format(pa.timestamp('ns')),
+                                            columns, filter)
+                except pa.ArrowInvalid as e:
+                    # e.g. tz-aware or non-ISO timestamps: read them as text and
+                    # let pandas parse them, as extract_csv does
+                    logger.warning(f"Arrow CSV parser rejected timestamps ({e}); retrying with pandas parsing")
+                    df = self._scan_dataset(path_or_paths, _csv_format(pa.string()),
+                                            columns, filter)
+                    if 'timestamp' in df.columns:
+                        df['timestamp'] = pd.to_datetime(df['timestamp'])
+            else:
+                df = self._scan_dataset(path_or_paths, format, columns, filter)
+            logger.info(f"Extracted {len(df)} rows")
+            return df
+        except Exception as e:
+            logger.error(f"Error extracting dataset: {e}")
+            return pd.DataFrame()
+    
+    @staticmethod
+    def _scan_dataset(path_or_paths: Union[str, List[str]],
+                      file_format: Any,
+                      columns: Optional[List[str]],
+                      filter: Optional[Any]) -> pd.DataFrame:
+        """Scan a pyarrow dataset into a DataFrame"""
+        dataset = ds.dataset(path_or_paths, format=file_format)
+        table = dataset.to_table(columns=columns, filter=filter, use_threads=True)
+        return table.to_pandas(self_destruct=True)
+    
     def extract_api(self, symbol: str, days: int = 365) -> pd.DataFrame:
         """Simulate API extraction (placeholder)"""
         logger.info(f"Extracting {symbol} data from API for {days} days")
         
         # Generate synthetic data
         dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-        price = 100.0
-        data = []
-        
-        for date in dates:
-            price *= (1 + np.random.normal(0.001, 0.02))
-            data.append({
-                'timestamp': date,
-                'symbol': symbol,
-                'open': price * (1 + np.random.uniform(-0.01, 0.01)),
-                'high': price * (1 + np.random.uniform(0, 0.02)),
-                'low': price * (1 - np.random.uniform(0, 0.02)),
-                'close': price,
-                'volume': np.random.uniform(1e6, 5e6)
-            })
-        
-        df = pd.DataFrame(data)
+        rng = self._rng
+
+        close = 100.0 * np.cumprod(1 + rng.normal(0.001, 0.02, size=days))
+        open_ = close * (1 + rng.uniform(-0.01, 0.01, size=days))
+        # Wrap high/low around open and close so every bar is valid OHLC
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, size=days))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, size=days))
+
+        df = pd.DataFrame({
+            'timestamp': dates,
+            'symbol': np.repeat(symbol, days),
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': rng.uniform(1e6, 5e6, size=days)
+        })
         logger.info(f"Extracted {len(df)} rows")
         return df
     
     def validate_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Validate data quality"""
+        df, report = self._validate_data(df)
+        self.data_quality_report.append(report)
+        return df
+    
+    def _validate_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+        """Validate data quality, returning the report entry instead of recording it"""
         logger.info("Validating data quality...")
         
         initial_rows = len(df)
@@ -84,82 +562,133 @@ class FinancialDataETL:
         if missing.any():
             issues.append(f"Missing values: {missing[missing > 0].to_dict()}")
         
-        # Check for duplicates
-        duplicates = df.duplicated().sum()
+        # Check for duplicates (keyed on timestamp/symbol instead of hashing every float column)
+        subset = [col for col in ('timestamp', 'symbol') if col in df.columns] or None
+        before = len(df)
+        df = df.drop_duplicates(subset=subset, keep='first')
+        duplicates = before - len(df)
         if duplicates > 0:
-            issues.append(f"Duplicate rows: {duplicates}")
-            df = df.drop_duplicates()
-        
-        # Validate OHLC relationships
-        if all(col in df.columns for col in ['open', 'high', 'low', 'close']):
-            invalid_ohlc = (
-                (df['high'] < df['low']) |
-                (df['high'] < df['open']) |
-                (df['high'] < df['close']) |
-                (df['low'] > df['open']) |
-                (df['low'] > df['close'])
-            )
-            if invalid_ohlc.any():
-                issues.append(f"Invalid OHLC relationships: {invalid_ohlc.sum()} rows")
-                df = df[~invalid_ohlc]
+            key = f" (by {', '.join(subset)})" if subset else ""
+            issues.append(f"Duplicate rows{key}: {duplicates}")
         
-        # Check for negative prices
+        # Validate OHLC relationships; all row checks share a single keep mask
         price_cols = ['open', 'high', 'low', 'close']
-        for col in price_cols:
-            if col in df.columns:
-                negative = (df[col] <= 0).sum()
+        keep = np.ones(len(df), dtype=bool)
+        
+        if all(col in df.columns for col in price_cols):
+            ohlc = df[price_cols].to_numpy(dtype=np.float64)
+            # Valid bars have high as the row maximum and low as the row minimum;
+            # fmax/fmin skip NaN so a missing price cannot hide a broken high/low
+            invalid_ohlc = ((ohlc[:, 1] < np.fmax.reduce(ohlc, axis=1))
+                            | (ohlc[:, 2] > np.fmin.reduce(ohlc, axis=1)))
+            n_invalid = int(invalid_ohlc.sum())
+            if n_invalid > 0:
+                issues.append(f"Invalid OHLC relationships: {n_invalid} rows")
+                keep &= ~invalid_ohlc
+        
+        # Check for negative prices
+        present = [col for col in price_cols if col in df.columns]
+        if present:
+            non_positive = df[present].to_numpy(dtype=np.float64) <= 0
+            for col, negative in zip(present, non_positive.sum(axis=0)):
                 if negative > 0:
                     issues.append(f"Negative {col}: {negative} rows")
-                    df = df[df[col] > 0]
+            keep &= ~non_positive.any(axis=1)
         
         # Check for negative volume
         if 'volume' in df.columns:
-            negative_vol = (df['volume'] < 0).sum()
-            if negative_vol > 0:
-                issues.append(f"Negative volume: {negative_vol} rows")
-                df = df[df['volume'] >= 0]
+            negative_vol = df['volume'].to_numpy(dtype=np.float64) < 0
+            if negative_vol.any():
+                issues.append(f"Negative volume: {negative_vol.sum()} rows")
+                keep &= ~negative_vol
+        
+        if not keep.all():
+            df = df[keep]
+        
+        # Downcast OHLC prices to the configured precision (halves memory traffic).
+        # Volume is left alone: float32 is only exact for integers up to 2**24.
+        if self.dtype is not None:
+            ohlc_cols = [c for c in price_cols if c in df.columns]
+            df = df.astype({col: self.dtype for col in ohlc_cols})
         
         final_rows = len(df)
         removed = initial_rows - final_rows
         
-        self.data_quality_report.append({
+        report = {
             'timestamp': datetime.now(),
             'initial_rows': initial_rows,
             'final_rows': final_rows,
             'removed_rows': removed,
             'issues': issues
-        })
+        }
         
         logger.info(f"Validation complete. Removed {removed} rows")
-        return df
+        return df, report
     
     def transform_add_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add technical indicators"""
         logger.info("Adding technical indicators...")
         
         if 'close' in df.columns:
-            # Simple Moving Averages
-            df['sma_20'] = df['close'].rolling(window=20).mean()
-            df['sma_50'] = df['close'].rolling(window=50).mean()
-            
-            # Returns
-            df['returns'] = df['close'].pct_change()
-            df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
-            
-            # Volatility
-            df['volatility_20'] = df['returns'].rolling(window=20).std() * np.sqrt(252)
-            
-            # RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss.replace(0, np.nan)
-            df['rsi'] = 100 - (100 / (1 + rs))
-            df['rsi'] = df['rsi'].fillna(100)  # RSI=100 when loss=0
+            close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+            # SMA 20/50, returns, log returns, volatility and Wilder RSI(14)
+            *indicators, state = self._cached_indicators(close)
+            # Seed the streaming state so later bars can be appended incrementally
+            self._indicator_state = IndicatorState.from_array(close[-_TAIL_LENGTH:].copy(), state)
+            df = _assign_indicators(df, indicators)
         
         logger.info(f"Added indicators. Shape: {df.shape}")
         return df
     
+    def _cached_indicators(self, close: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Run the indicator kernel, reusing results for identical close series"""
+        key = (len(close), _array_digest(close))
+        cached = self._indicator_cache.get(key)
+        if cached is not None:
+            self._indicator_cache.move_to_end(key)
+            return cached
+        
+        state = np.zeros(_STATE_SIZE)
+        result = (*_advance_indicators(close, 0, state), state)
+        if self.indicator_cache_size > 0:
+            for arr in result:
+                arr.flags.writeable = False  # shared between callers on cache hits
+            self._indicator_cache[key] = result
+            if len(self._indicator_cache) > self.indicator_cache_size:
+                self._indicator_cache.popitem(last=False)
+        return result
+    
+    def transform_add_indicators_streaming(self,
+                                           df: pd.DataFrame,
+                                           state: Optional[IndicatorState] = None
+                                           ) -> Tuple[pd.DataFrame, IndicatorState]:
+        """
+        Add technical indicators to newly appended bars only.
+        
+        Args:
+            df: New rows, in time order, following the bars already seen
+            state: State returned by the previous call; defaults to the state
+                kept on the instance (empty before the first call)
+        """
+        logger.info(f"Adding technical indicators to {len(df)} new rows...")
+        
+        if state is None:
+            state = self._indicator_state or IndicatorState()
+        
+        if 'close' in df.columns:
+            new_close = df['close'].to_numpy(dtype=np.float64)
+            tail = state.close_tail
+            close = np.ascontiguousarray(np.concatenate([tail, new_close]))
+            running = state.to_array()
+            indicators = _advance_indicators(close, len(tail), running)
+            df = _assign_indicators(df, indicators)
+            
+            state = IndicatorState.from_array(close[-_TAIL_LENGTH:].copy(), running)
+        
+        self._indicator_state = state
+        logger.info(f"Added indicators. Shape: {df.shape}")
+        return df, state
+    
     def transform_resample(self, df: pd.DataFrame, freq: str = 'W') -> pd.DataFrame:
         """Resample data to different frequency"""
         logger.info(f"Resampling to {freq} frequency...")
@@ -168,9 +697,12 @@ class FinancialDataETL:
             logger.error("No timestamp column found")
             return df
         
-        df = df.set_index('timestamp')
+        if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+            # e.g. ISO strings from JSON sources
+            df = df.assign(timestamp=pd.to_datetime(df['timestamp']))
         
-        resampled = df.resample(freq).agg({
+        # Resample on the column directly, avoiding a set_index round-trip
+        resampled = df.resample(freq, on='timestamp').agg({
             'open': 'first',
             'high': 'max',
             'low': 'min',
@@ -181,12 +713,31 @@ class FinancialDataETL:
         logger.info(f"Resampled to {len(resampled)} rows")
         return resampled.reset_index()
     
-    def load_to_file(self, df: pd.DataFrame, filepath: str):
-        """Load data to file"""
+    def load_to_file(self, df: Union[pd.DataFrame, List[Dict]], filepath: str):
+        """Load data to file (a DataFrame, or raw records from extract_json_raw)"""
         logger.info(f"Loading data to {filepath}")
         
+        if isinstance(df, list):
+            if self.output_format == 'json':
+                # Records go straight back out without a DataFrame round-trip
+                _write_json(df, filepath)
+                logger.info(f"Successfully loaded {len(df)} rows")
+                return
+            df = pd.DataFrame(_records_to_columns(df))
+        
         if self.output_format == 'parquet':
-            df.to_parquet(filepath, index=False)
+            if pq is not None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                pq.write_table(
+                    table,
+                    filepath,
+                    compression=self.compression,
+                    use_dictionary=True,
+                    write_statistics=True,
+                    row_group_size=self.row_group_size,
+                )
+            else:
+                df.to_parquet(filepath, index=False, compression=self.compression)
         elif self.output_format == 'csv':
             df.to_csv(filepath, index=False)
         elif self.output_format == 'json':
@@ -201,35 +752,54 @@ class FinancialDataETL:
                     source_path: str,
                     output_path: str,
                     add_indicators: bool = True,
-                    resample_freq: Optional[str] = None) -> pd.DataFrame:
+                    resample_freq: Optional[str] = None,
+                    columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Run complete ETL pipeline.
         
         Args:
-            source_type: 'csv', 'json', or 'api'
-            source_path: Path to source file or API symbol
+            source_type: 'csv', 'json', 'api', 'parquet' or 'csv_dataset'
+            source_path: Path to source file/directory or API symbol
             output_path: Path to output file
             add_indicators: Whether to add technical indicators
             resample_freq: Resampling frequency (e.g., 'W', 'M')
+            columns: Columns to read for 'parquet'/'csv_dataset' sources
         """
+        df, reports = self._run_pipeline(source_type, source_path, output_path,
+                                         add_indicators, resample_freq, columns)
+        self.data_quality_report.extend(reports)
+        return df
+    
+    def _run_pipeline(self,
+                      source_type: str,
+                      source_path: str,
+                      output_path: str,
+                      add_indicators: bool,
+                      resample_freq: Optional[str],
+                      columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, List[Dict]]:
+        """Run one pipeline without touching the shared quality report"""
         logger.info("=== Starting ETL Pipeline ===")
         
         # Extract
         if source_type == 'csv':
             df = self.extract_csv(source_path)
         elif source_type == 'json':
-            df = self.extract_json(source_path)
+            df = self._extract_json_frame(source_path)
         elif source_type == 'api':
             df = self.extract_api(source_path)
+        elif source_type == 'parquet':
+            df = self.extract_dataset(source_path, format='parquet', columns=columns)
+        elif source_type == 'csv_dataset':
+            df = self.extract_dataset(source_path, format='csv', columns=columns)
         else:
             raise ValueError(f"Unknown source type: {source_type}")
         
         if df.empty:
             logger.error("No data extracted")
-            return df
+            return df, []
         
         # Transform
-        df = self.validate_data(df)
+        df, report = self._validate_data(df)
         
         if resample_freq:
             df = self.transform_resample(df, resample_freq)
@@ -241,11 +811,105 @@ class FinancialDataETL:
         self.load_to_file(df, output_path)
         
         logger.info("=== ETL Pipeline Complete ===")
-        return df
+        return df, [report]
+    
+    def run_pipeline_batch(self,
+                           symbols: List[str],
+                           output_template: str,
+                           source_type: str = 'api',
+                           add_indicators: bool = True,
+                           resample_freq: Optional[str] = None,
+                           max_workers: Optional[int] = None,
+                           use_processes: bool = True,
+                           columns: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Run independent pipelines for several symbols in parallel.
+        
+        Args:
+            symbols: API symbols, or source paths for file-based sources
+            output_template: Output path containing '{symbol}', e.g. 'out/{symbol}.parquet'.
+                For file sources the placeholder is filled with the file name stem.
+            source_type: 'csv', 'json', 'api', 'parquet' or 'csv_dataset'
+            add_indicators: Whether to add technical indicators
+            resample_freq: Resampling frequency (e.g., 'W', 'M')
+            max_workers: Pool size (defaults to the executor's own default)
+            use_processes: Process pool for CPU-bound work, thread pool for I/O-bound work
+            columns: Columns to read for 'parquet'/'csv_dataset' sources
+        
+        Returns:
+            Processed DataFrame per symbol
+        """
+        if source_type not in SOURCE_TYPES:
+            raise ValueError(f"Unknown source type: {source_type}")
+        
+        # Resolve every output path up front so collisions fail before any work starts;
+        # normpath strips trailing separators that would otherwise give an empty stem
+        outputs = {}
+        for symbol in symbols:
+            name = (symbol if source_type == 'api'
+                    else os.path.splitext(os.path.basename(os.path.normpath(symbol)))[0])
+            output_path = output_template.format(symbol=name)
+            for other, other_path in outputs.items():
+                if other_path == output_path:
+                    raise ValueError(f"Sources {other!r} and {symbol!r} both write to {output_path}")
+            outputs[symbol] = output_path
+        
+        logger.info(f"=== Starting batch ETL for {len(symbols)} sources ===")
+        
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_cls(max_workers=max_workers) as executor:
+            futures = {}
+            for symbol, output_path in outputs.items():
+                # Each job runs on its own copy so per-run state never leaks across symbols,
+                # with an independent generator derived from this instance's seed
+                worker = copy.copy(self)
+                worker._rng = np.random.default_rng(self._rng.integers(2**63))
+                worker._indicator_cache = OrderedDict()
+                futures[symbol] = executor.submit(
+                    worker._run_pipeline, source_type, symbol,
+                    output_path, add_indicators, resample_freq, columns
+                )
+            results = {symbol: future.result() for symbol, future in futures.items()}
+        
+        # Record quality reports once, in submission order
+        self.data_quality_report.extend(
+            report for _, reports in results.values() for report in reports
+        )
+        
+        logger.info("=== Batch ETL Complete ===")
+        return {symbol: df for symbol, (df, _) in results.items()}
     
     def get_quality_report(self) -> List[Dict]:
         """Get data quality report"""
-        return self.data_quality_report
+        return self.data_quality_report.to_dicts()
+    
+    def flush_quality_report(self, filepath: str) -> int:
+        """
+        Write the quality report to a single Parquet file and clear it.
+        
+        Returns:
+            Number of report rows written
+        """
+        records = self.data_quality_report.to_records()
+        logger.info(f"Flushing {len(records)} quality report rows to {filepath}")
+        
+        if pq is not None:
+            table = pa.table({
+                'timestamp': pa.array(records['timestamp'], type=pa.timestamp('us')),
+                'initial_rows': pa.array(records['initial_rows'], type=pa.int64()),
+                'final_rows': pa.array(records['final_rows'], type=pa.int64()),
+                'removed_rows': pa.array(records['removed_rows'], type=pa.int64()),
+                'issues': pa.array(list(records['issues']), type=pa.list_(pa.string())),
+            })
+            pq.write_table(table, filepath, compression=self.compression)
+        else:
+            self.data_quality_report.to_frame().to_parquet(
+                filepath, index=False, compression=self.compression
+            )
+        
+        written = len(records)
+        self.data_quality_report.clear()
+        return written
 
 if __name__ == "__main__":
     # Example usage
@@ -47,6 +47,18 @@ class TestExtract:
         for col in ['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume']:
             assert col in df.columns
 
+    def test_extract_api_generates_valid_ohlc(self, etl):
+        df = etl.extract_api('TEST', days=365)
+        assert (df['high'] >= df[['open', 'close']].max(axis=1)).all()
+        assert (df['low'] <= df[['open', 'close']].min(axis=1)).all()
+        assert (df['symbol'] == 'TEST').all()
+
+    def test_extract_api_reproducible(self):
+        first = FinancialDataETL(output_format='csv', seed=7).extract_api('TEST', days=100)
+        second = FinancialDataETL(output_format='csv', seed=7).extract_api('TEST', days=100)
+        cols = ['open', 'high', 'low', 'close', 'volume']
+        pd.testing.assert_frame_equal(first[cols], second[cols])
+
     def test_extract_csv_from_file(self, etl, sample_ohlcv):
         with tempfile.NamedTemporaryFile(suffix='.csv', delete=False, mode='w') as f:
             sample_ohlcv.to_csv(f.name, index=False)
@@ -58,6 +70,50 @@ class TestExtract:
         finally:
             os.unlink(path)
 
+    def test_extract_csv_parses_timestamp(self, etl, sample_ohlcv):
+        data = sample_ohlcv.assign(symbol='TEST')
+        data.loc[3, 'symbol'] = None
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False, mode='w') as f:
+            data.to_csv(f.name, index=False)
+            path = f.name
+        try:
+            df = etl.extract_csv(path)
+            assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+            assert df['close'].dtype == np.float64
+            # Empty string cells are missing values, as with pandas
+            pd.testing.assert_series_equal(df.isnull().sum(), pd.read_csv(path).isnull().sum())
+            assert df['symbol'].isnull().sum() == 1
+        finally:
+            os.unlink(path)
+
+    @pytest.mark.parametrize('timestamps', [
+        pd.date_range('2023-01-01', periods=100, freq='D', tz='UTC'),
+        pd.date_range('2023-01-01', periods=100, freq='D').strftime('%m/%d/%Y'),
+    ], ids=['tz-aware', 'us-dates'])
+    def test_extract_csv_timestamps_arrow_rejects(self, etl, sample_ohlcv, timestamps):
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False, mode='w') as f:
+            sample_ohlcv.assign(timestamp=timestamps).to_csv(f.name, index=False)
+            path = f.name
+        try:
+            df = etl.extract_csv(path)
+            assert len(df) == 100
+            assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+        finally:
+            os.unlink(path)
+
+    def test_extract_csv_without_pyarrow(self, etl, sample_ohlcv, monkeypatch):
+        import etl_pipeline
+        monkeypatch.setattr(etl_pipeline, 'pacsv', None)
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False, mode='w') as f:
+            sample_ohlcv.to_csv(f.name, index=False)
+            path = f.name
+        try:
+            df = etl.extract_csv(path)
+            assert len(df) == 100
+            assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+        finally:
+            os.unlink(path)
+
     def test_extract_csv_missing_file(self, etl):
         df = etl.extract_csv('/nonexistent/path.csv')
         assert isinstance(df, pd.DataFrame)
@@ -73,6 +129,87 @@ class TestExtract:
         finally:
             os.unlink(path)
 
+    def test_extract_dataset_multiple_csv(self, etl, sample_ohlcv):
+        pytest.importorskip('pyarrow.dataset')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i, chunk in enumerate([sample_ohlcv.iloc[:40], sample_ohlcv.iloc[40:]]):
+                chunk.to_csv(os.path.join(tmpdir, f'part-{i}.csv'), index=False)
+            df = etl.extract_dataset(tmpdir, format='csv')
+            assert len(df) == 100
+            assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+
+    def test_extract_dataset_tz_aware_csv(self, etl, sample_ohlcv):
+        pytest.importorskip('pyarrow.dataset')
+        df = sample_ohlcv.assign(timestamp=sample_ohlcv['timestamp'].dt.tz_localize('UTC'))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i, chunk in enumerate([df.iloc[:40], df.iloc[40:]]):
+                chunk.to_csv(os.path.join(tmpdir, f'part-{i}.csv'), index=False)
+            result = etl.extract_dataset(tmpdir, format='csv')
+            assert len(result) == 100
+            assert pd.api.types.is_datetime64_any_dtype(result['timestamp'])
+
+    def test_extract_dataset_parquet_columns_and_filter(self, etl, sample_ohlcv):
+        ds = pytest.importorskip('pyarrow.dataset')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data.parquet')
+            sample_ohlcv.to_parquet(path, index=False)
+            df = etl.extract_dataset(path, format='parquet', columns=['timestamp', 'close'],
+                                     filter=ds.field('close') > 100)
+            assert list(df.columns) == ['timestamp', 'close']
+            assert (df['close'] > 100).all()
+            assert len(df) == (sample_ohlcv['close'] > 100).sum()
+
+    def test_extract_dataset_missing_path(self, etl):
+        df = etl.extract_dataset('/nonexistent/dir', format='csv')
+        assert df.empty
+
+    def test_import_defers_heavy_dependencies(self):
+        import subprocess
+        code = (
+            "import sys; sys.path.insert(0, sys.argv[1]); import etl_pipeline; "
+            "print(any(m in sys.modules for m in ('pandas', 'pyarrow', 'numba')))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, '-c', code, root],
+                             capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == 'False'
+
+    def test_lightweight_json_round_trip(self, sample_ohlcv):
+        etl = FinancialDataETL(output_format='json', lightweight=True)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, 'in.json')
+            target = os.path.join(tmpdir, 'out.json')
+            sample_ohlcv.to_json(source, orient='records', date_format='iso')
+            records = etl.extract_json(source)
+            assert isinstance(records, list)
+            assert len(records) == 100
+            etl.load_to_file(records, target)
+            assert len(pd.read_json(target)) == 100
+
+    def test_extract_json_nan_tokens(self, etl):
+        import json
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False, mode='w') as f:
+            json.dump([{'close': 1.0, 'x': float('nan')}, {'close': 2.0, 'x': float('inf')}], f)
+            path = f.name
+        try:
+            df = etl.extract_json(path)
+            assert len(df) == 2
+            assert np.isnan(df.loc[0, 'x'])
+            assert np.isinf(df.loc[1, 'x'])
+        finally:
+            os.unlink(path)
+
+    def test_extract_json_ragged_records(self, etl):
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False, mode='w') as f:
+            f.write('[{"close": 1.0, "volume": 10}, {"close": 2.0}, {"close": 3.0, "extra": 1}]')
+            path = f.name
+        try:
+            df = etl.extract_json(path)
+            assert len(df) == 3
+            assert set(df.columns) == {'close', 'volume', 'extra'}
+        finally:
+            os.unlink(path)
+
 
 class TestValidate:
     def test_removes_duplicates(self, etl, sample_ohlcv):
@@ -80,6 +217,15 @@ class TestValidate:
         result = etl.validate_data(df)
         assert len(result) == 100
 
+    def test_duplicates_keyed_on_timestamp(self, etl, sample_ohlcv):
+        df = sample_ohlcv.copy()
+        df['open'] = df['close']
+        dup = df.iloc[:3].copy()
+        dup['volume'] += 1  # same bar re-delivered with a revised volume
+        result = etl.validate_data(pd.concat([df, dup]))
+        assert len(result) == 100
+        assert 'Duplicate rows (by timestamp): 3' in etl.get_quality_report()[0]['issues']
+
     def test_removes_negative_prices(self, etl, sample_ohlcv):
         sample_ohlcv.loc[0, 'close'] = -10
         result = etl.validate_data(sample_ohlcv)
@@ -91,6 +237,27 @@ class TestValidate:
         result = etl.validate_data(sample_ohlcv)
         assert len(result) < len(sample_ohlcv)
 
+    def test_invalid_ohlc_with_missing_open(self, etl, sample_ohlcv):
+        df = sample_ohlcv.copy()
+        df['open'] = df['close']  # keep the fixture within the OHLC envelope
+        df.loc[0, ['open', 'high', 'low']] = [np.nan, 5.0, 10.0]
+        result = etl.validate_data(df)
+        issues = etl.get_quality_report()[0]['issues']
+        assert 'Invalid OHLC relationships: 1 rows' in issues
+        assert df.loc[0, 'timestamp'] not in set(result['timestamp'])
+
+    def test_quality_report_counts_each_check(self, etl, sample_ohlcv):
+        df = sample_ohlcv.copy()
+        df['open'] = df['close']  # keep the fixture within the OHLC envelope
+        df.loc[0, 'close'] = -10
+        df.loc[1, 'volume'] = -1
+        df.loc[2, 'volume'] = -1
+        result = etl.validate_data(df)
+        issues = etl.get_quality_report()[0]['issues']
+        assert 'Negative close: 1 rows' in issues
+        assert 'Negative volume: 2 rows' in issues
+        assert len(result) == 97
+
     def test_quality_report_populated(self, etl, sample_ohlcv):
         etl.validate_data(sample_ohlcv)
         report = etl.get_quality_report()
@@ -98,6 +265,46 @@ class TestValidate:
         assert 'initial_rows' in report[0]
         assert 'final_rows' in report[0]
 
+    def test_quality_report_grows_past_capacity(self, etl, sample_ohlcv):
+        for _ in range(40):
+            etl.validate_data(sample_ohlcv.iloc[:10])
+        report = etl.get_quality_report()
+        assert len(report) == 40
+        assert all(entry['initial_rows'] == 10 for entry in report)
+
+    def test_flush_quality_report_to_parquet(self, etl, sample_ohlcv):
+        pq = pytest.importorskip('pyarrow.parquet')
+        etl.validate_data(sample_ohlcv)
+        etl.validate_data(pd.concat([sample_ohlcv, sample_ohlcv.iloc[:5]]))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'quality.parquet')
+            assert etl.flush_quality_report(path) == 2
+            table = pq.read_table(path)
+            assert table.column_names == ['timestamp', 'initial_rows', 'final_rows',
+                                          'removed_rows', 'issues']
+            assert table.column('initial_rows').to_pylist() == [100, 105]
+            assert any('Duplicate' in issue for issue in table.column('issues')[1].as_py())
+        assert etl.get_quality_report() == []
+
+    def test_downcasts_ohlc_to_float32(self, etl, sample_ohlcv):
+        result = etl.validate_data(sample_ohlcv)
+        for col in ['open', 'high', 'low', 'close']:
+            assert result[col].dtype == np.float32
+        assert result['volume'].dtype == np.float64
+
+    def test_large_volumes_survive_validation(self, etl, sample_ohlcv):
+        volumes = np.array([123456789, 987654321], dtype=np.int64)
+        df = sample_ohlcv.iloc[:2].copy()
+        df['open'] = df['close']
+        df['volume'] = volumes
+        result = etl.validate_data(df)
+        assert (result['volume'].to_numpy() == volumes).all()
+
+    def test_dtype_none_keeps_float64(self, sample_ohlcv):
+        etl = FinancialDataETL(output_format='csv', dtype=None)
+        result = etl.validate_data(sample_ohlcv)
+        assert result['close'].dtype == np.float64
+
 
 class TestTransform:
     def test_add_indicators_creates_columns(self, etl, sample_ohlcv):
@@ -105,6 +312,36 @@ class TestTransform:
         for col in ['sma_20', 'sma_50', 'returns', 'log_returns', 'volatility_20', 'rsi']:
             assert col in result.columns
 
+    def test_indicators_match_pandas_rolling(self, etl, sample_ohlcv):
+        result = etl.transform_add_indicators(sample_ohlcv.copy())
+        close = sample_ohlcv['close']
+        returns = close.pct_change()
+        expected = {
+            'sma_20': close.rolling(window=20).mean(),
+            'sma_50': close.rolling(window=50).mean(),
+            'returns': returns,
+            'log_returns': np.log(close / close.shift(1)),
+            'volatility_20': returns.rolling(window=20).std() * np.sqrt(252),
+        }
+        for col, values in expected.items():
+            np.testing.assert_allclose(result[col], values, rtol=1e-9, err_msg=col)
+
+    def test_indicators_zero_close(self, etl):
+        close = pd.Series([1.0, 0.0, 1.0] * 10)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = etl.transform_add_indicators(pd.DataFrame({'close': close}))
+            expected_returns = close.pct_change()
+            expected_log = np.log(close / close.shift(1))
+        np.testing.assert_array_equal(result['returns'], expected_returns)
+        np.testing.assert_array_equal(result['log_returns'], expected_log)
+
+    def test_volatility_constant_returns_is_zero(self, etl):
+        prices = 100 * 1.01 ** np.arange(200, dtype=float)
+        result = etl.transform_add_indicators(pd.DataFrame({'close': prices}))
+        vol = result['volatility_20'].dropna()
+        assert len(vol) == 180
+        assert (vol.abs() < 1e-10).all()
+
     def test_rsi_in_valid_range(self, etl, sample_ohlcv):
         result = etl.transform_add_indicators(sample_ohlcv.copy())
         valid_rsi = result['rsi'].dropna()
@@ -125,6 +362,66 @@ class TestTransform:
         valid_rsi = result['rsi'].dropna()
         assert (valid_rsi == 100).all()
 
+    def test_rsi_uses_wilder_smoothing(self, etl, sample_ohlcv):
+        result = etl.transform_add_indicators(sample_ohlcv.copy())
+        delta = np.diff(sample_ohlcv['close'].to_numpy())
+        avg_gain = avg_loss = None
+        for d in delta:
+            g, l = max(d, 0.0), max(-d, 0.0)
+            if avg_gain is None:
+                avg_gain, avg_loss = g, l
+            else:
+                avg_gain = (avg_gain * 13 + g) / 14
+                avg_loss = (avg_loss * 13 + l) / 14
+        expected = 100 - 100 / (1 + avg_gain / avg_loss)
+        assert result['rsi'].iloc[-1] == pytest.approx(expected)
+        assert result['rsi'].iloc[:14].isna().all()
+
+    def test_indicators_follow_close_precision(self, etl, sample_ohlcv):
+        validated = etl.validate_data(sample_ohlcv)
+        result = etl.transform_add_indicators(validated)
+        for col in ['sma_20', 'sma_50', 'returns', 'log_returns', 'volatility_20', 'rsi']:
+            assert result[col].dtype == np.float32
+        assert 'rsi' not in validated.columns
+
+    def test_indicator_cache_reuses_results(self, sample_ohlcv):
+        etl = FinancialDataETL(output_format='csv', indicator_cache_size=2)
+        first = etl.transform_add_indicators(sample_ohlcv.copy())
+        second = etl.transform_add_indicators(sample_ohlcv.copy())
+        assert len(etl._indicator_cache) == 1
+        # Mutating a returned frame must not leak into the cached arrays
+        second.loc[60, 'rsi'] = -1.0
+        third = etl.transform_add_indicators(sample_ohlcv.copy())
+        assert third.loc[60, 'rsi'] == first.loc[60, 'rsi']
+        for n in (90, 80, 70):
+            etl.transform_add_indicators(sample_ohlcv.iloc[:n].copy())
+        assert len(etl._indicator_cache) == 2
+
+    def test_streaming_indicators_match_batch(self, etl, sample_ohlcv):
+        indicator_cols = ['sma_20', 'sma_50', 'returns', 'log_returns', 'volatility_20', 'rsi']
+        batch = etl.transform_add_indicators(sample_ohlcv.copy())
+        streaming = FinancialDataETL(output_format='csv')
+        state = None
+        chunks = []
+        for start, stop in [(0, 10), (10, 60), (60, 61), (61, 100)]:
+            chunk, state = streaming.transform_add_indicators_streaming(
+                sample_ohlcv.iloc[start:stop].copy(), state
+            )
+            chunks.append(chunk)
+        result = pd.concat(chunks)
+        for col in indicator_cols:
+            np.testing.assert_allclose(result[col], batch[col], rtol=1e-9, err_msg=col)
+        assert len(state.close_tail) == 51
+
+    def test_streaming_continues_from_batch(self, etl, sample_ohlcv):
+        batch = etl.transform_add_indicators(sample_ohlcv.copy())
+        fresh = FinancialDataETL(output_format='csv')
+        head = fresh.transform_add_indicators(sample_ohlcv.iloc[:80].copy())
+        tail, _ = fresh.transform_add_indicators_streaming(sample_ohlcv.iloc[80:].copy())
+        np.testing.assert_allclose(tail['rsi'], batch['rsi'].iloc[80:], rtol=1e-9)
+        np.testing.assert_allclose(tail['sma_50'], batch['sma_50'].iloc[80:], rtol=1e-9)
+        assert len(head) == 80
+
     def test_resample_reduces_rows(self, etl, sample_ohlcv):
         result = etl.transform_resample(sample_ohlcv.copy(), 'W')
         assert len(result) < len(sample_ohlcv)
@@ -134,6 +431,14 @@ class TestTransform:
         for col in ['open', 'high', 'low', 'close', 'volume']:
             assert col in result.columns
 
+    def test_resample_string_timestamps(self, etl, sample_ohlcv):
+        df = sample_ohlcv.copy()
+        df['timestamp'] = df['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+        result = etl.transform_resample(df, 'W')
+        expected = etl.transform_resample(sample_ohlcv.copy(), 'W')
+        assert len(result) == len(expected)
+        assert pd.api.types.is_datetime64_any_dtype(result['timestamp'])
+
 
 class TestPipeline:
     def test_pipeline_order_preserves_indicators(self, etl):
@@ -169,6 +474,61 @@ class TestPipeline:
         finally:
             os.unlink(output_path)
 
+    def test_pipeline_parquet_source_with_columns(self, etl, sample_ohlcv):
+        pytest.importorskip('pyarrow.dataset')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, 'source.parquet')
+            sample_ohlcv.assign(note='x').to_parquet(source, index=False)
+            df = etl.run_pipeline(
+                source_type='parquet',
+                source_path=source,
+                output_path=os.path.join(tmpdir, 'out.csv'),
+                columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'],
+            )
+            assert 'note' not in df.columns
+            assert 'rsi' in df.columns
+
+    @pytest.mark.parametrize('use_processes', [False, True])
+    def test_pipeline_batch(self, etl, use_processes):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = etl.run_pipeline_batch(
+                ['AAA', 'BBB', 'CCC'],
+                os.path.join(tmpdir, '{symbol}.csv'),
+                max_workers=2,
+                use_processes=use_processes,
+            )
+            assert set(results) == {'AAA', 'BBB', 'CCC'}
+            for symbol, df in results.items():
+                assert (df['symbol'] == symbol).all()
+                assert os.path.exists(os.path.join(tmpdir, f'{symbol}.csv'))
+        assert len(etl.get_quality_report()) == 3
+        # Workers draw from independent generators
+        assert not np.allclose(results['AAA']['close'], results['BBB']['close'])
+
+    def test_pipeline_batch_directory_trailing_slash(self, etl, sample_ohlcv):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, 'ticks')
+            os.mkdir(source)
+            sample_ohlcv.to_csv(os.path.join(source, 'part-0.csv'), index=False)
+            results = etl.run_pipeline_batch(
+                [source + os.sep],
+                os.path.join(tmpdir, '{symbol}.csv'),
+                source_type='csv_dataset',
+                use_processes=False,
+            )
+            assert len(results[source + os.sep]) > 0
+            assert os.path.exists(os.path.join(tmpdir, 'ticks.csv'))
+
+    def test_pipeline_batch_duplicate_output(self, etl):
+        with pytest.raises(ValueError, match='both write to'):
+            etl.run_pipeline_batch(
+                ['a/x.csv', 'b/x.csv'], '/tmp/{symbol}.csv', source_type='csv'
+            )
+
+    def test_pipeline_batch_invalid_source(self, etl):
+        with pytest.raises(ValueError):
+            etl.run_pipeline_batch(['X'], '/tmp/{symbol}.csv', source_type='invalid')
+
     def test_pipeline_invalid_source(self, etl):
         with pytest.raises(ValueError):
             etl.run_pipeline(
@@ -200,6 +560,20 @@ class TestLoadToFile:
         finally:
             os.unlink(path)
 
+    def test_parquet_output(self, sample_ohlcv):
+        pq = pytest.importorskip('pyarrow.parquet')
+        etl = FinancialDataETL(output_format='parquet', row_group_size=40)
+        with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as f:
+            path = f.name
+        try:
+            etl.load_to_file(sample_ohlcv, path)
+            metadata = pq.ParquetFile(path).metadata
+            assert metadata.num_rows == 100
+            assert metadata.num_row_groups == 3
+            assert metadata.row_group(0).column(0).compression == 'SNAPPY'
+        finally:
+            os.unlink(path)
+
     def test_invalid_format(self, sample_ohlcv):
         etl = FinancialDataETL(output_format='xlsx')
         with pytest.raises(ValueError):